@@ -11,13 +11,15 @@ __author__ = "Steve Murr"
 __license__ = "MIT"
 
 from unmix.audio_io import load_audio_file, write_audio_file, get_audio_info
-from unmix.separator import separate_stems
-from unmix.filters import separate_drums
+from unmix.separator import separate_stems, separate_stems_batch
+from unmix.filters import separate_drums, separate_drums_array
 
 __all__ = [
     "load_audio_file",
     "write_audio_file",
     "get_audio_info",
     "separate_stems",
+    "separate_stems_batch",
     "separate_drums",
+    "separate_drums_array",
 ]
@@ -10,6 +10,10 @@ import numpy as np
 from pathlib import Path
 from typing import Tuple, Union, Optional
 
+# Bytes handed to libsndfile per write call — large slices amortize the
+# per-call and syscall overhead compared to its small default buffering
+_WRITE_CHUNK_BYTES = 1 << 20
+
 
 def load_audio_file(
     filepath: Union[str, Path],
@@ -49,11 +53,11 @@ def load_audio_file(
         >>> audio, sr = load_audio_file("song.flac", duration=10.0)
     """
     try:
-        import librosa
+        import soundfile as sf
     except ImportError:
         raise ImportError(
-            "librosa is required for audio loading. "
-            "Install with: pip install librosa"
+            "soundfile is required for audio loading. "
+            "Install with: pip install soundfile"
         )
 
     filepath = Path(filepath)
@@ -61,9 +65,75 @@ def load_audio_file(
     if not filepath.exists():
         raise FileNotFoundError(f"Audio file not found: {filepath}")
 
+    # Decode through libsndfile (C, GIL-released) whenever it understands
+    # the format; librosa's audioread path is kept only as a fallback for
+    # formats libsndfile can't open (e.g. MP3 on older libsndfile builds).
+    try:
+        file_sr = sf.info(str(filepath)).samplerate
+        audio, _ = sf.read(
+            str(filepath),
+            start=int(offset * file_sr),
+            frames=int(duration * file_sr) if duration else -1,
+            dtype='float32',
+            always_2d=True
+        )
+    except sf.LibsndfileError:
+        return _load_with_librosa(filepath, sample_rate, mono, offset, duration)
+    except Exception as e:
+        raise ValueError(
+            f"Failed to load audio file '{filepath}': {e}"
+        ) from e
+
+    # Resample with soxr (vectorized C resampler) on the (samples, channels)
+    # layout, which is what soxr expects
+    if sample_rate is not None and sample_rate != file_sr:
+        try:
+            import soxr
+        except ImportError:
+            raise ImportError(
+                "soxr is required for resampling. "
+                "Install with: pip install soxr"
+            )
+        audio = soxr.resample(audio, file_sr, sample_rate)
+        sr = sample_rate
+    else:
+        sr = file_sr
+
+    # Convert to (channels, samples); collapse single-channel audio to
+    # (samples,) to match the shapes librosa produced
+    audio = audio.T
+    if mono:
+        audio = audio.mean(axis=0)
+    elif audio.shape[0] == 1:
+        audio = audio[0]
+
+    return audio, sr
+
+
+def _load_with_librosa(
+    filepath: Path,
+    sample_rate: Optional[int],
+    mono: bool,
+    offset: float,
+    duration: Optional[float]
+) -> Tuple[np.ndarray, int]:
+    """
+    Fallback loader for formats libsndfile cannot decode.
+
+    Takes the same arguments as load_audio_file and returns the same
+    (audio_data, sample_rate) tuple.
+    """
+    try:
+        import librosa
+    except ImportError:
+        raise ImportError(
+            "librosa is required to load this audio format. "
+            "Install with: pip install librosa"
+        )
+
     try:
         # librosa.load returns (audio, sample_rate)
-        # audio shape is (samples,) for mono or will be converted based on mono parameter
+        # audio shape is (samples,) for mono or (channels, samples) otherwise
         audio, sr = librosa.load(
             str(filepath),
             sr=sample_rate,
@@ -149,9 +219,17 @@ def write_audio_file(
 
     # Normalize if requested
     if normalize:
-        max_val = np.abs(audio).max()
+        # Peak from the separate min/max reductions — no full-size |audio|
+        # temporary like np.abs(audio).max() would allocate
+        max_val = max(float(audio.max()), -float(audio.min()))
         if max_val > 0:
-            audio = audio / max_val * 0.95  # Leave headroom
+            # One multiply by a precomputed factor (leaves headroom); a
+            # dtype-matched scalar keeps float32 audio from being
+            # promoted to float64
+            scale = 0.95 / max_val
+            if np.issubdtype(audio.dtype, np.floating):
+                scale = audio.dtype.type(scale)
+            audio = audio * scale
 
     # Ensure audio is in correct format for soundfile
     # soundfile expects (samples, channels) for multi-channel
@@ -159,13 +237,21 @@ def write_audio_file(
         # Convert from (channels, samples) to (samples, channels)
         audio = audio.T
 
+    # Stream the data out in ~1 MiB slices through an explicit SoundFile
+    # handle so every libsndfile call moves a big buffer
+    channels = audio.shape[1] if len(audio.shape) > 1 else 1
+    chunk_frames = max(_WRITE_CHUNK_BYTES // (channels * audio.dtype.itemsize), 1)
+
     try:
-        sf.write(
+        with sf.SoundFile(
             str(filepath),
-            audio,
-            sample_rate,
+            mode='w',
+            samplerate=sample_rate,
+            channels=channels,
             subtype=subtype_map[bit_depth]
-        )
+        ) as f:
+            for start in range(0, len(audio), chunk_frames):
+                f.write(audio[start:start + chunk_frames])
     except Exception as e:
         raise ValueError(
             f"Failed to write audio file '{filepath}': {e}"
@@ -9,9 +9,11 @@ Handles argument parsing and orchestrates the separation workflow.
 import os
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 from unmix.separator import separate_stems
-from unmix.filters import separate_drums
+from unmix.filters import separate_drums, separate_drums_array
 
 
 def main():
@@ -72,6 +74,13 @@ Examples:
         help='Demucs model to use (default: htdemucs)'
     )
 
+    parser.add_argument(
+        '--quantize',
+        action='store_true',
+        help='Quantize the model to int8 when running on CPU (faster, '
+             'near-identical quality; ignored on GPU)'
+    )
+
     args = parser.parse_args()
 
     # Check if input file exists
@@ -83,21 +92,52 @@ Examples:
     print("Audio Source Separation Tool")
     print("=" * 60)
 
-    if args.mode in ['stems', 'both']:
+    if args.mode == 'both':
+        print("\n📊 Step 1: Separating stereo mix into stems...")
+        # Keep the stems in memory so the drum stage doesn't have to
+        # decode the freshly written drums file back from disk, and hand
+        # the stem encodes to a thread pool so the (CPU-bound) drum stage
+        # runs while vocals/bass/other are still being written. Leaving
+        # the with-block waits for every queued write.
+        with ThreadPoolExecutor(max_workers=4) as write_pool:
+            write_futures = []
+            stem_files, stem_arrays, sample_rate = separate_stems(
+                args.input_file,
+                args.output_stems,
+                args.model,
+                return_arrays=True,
+                executor=write_pool,
+                write_futures=write_futures,
+                quantize=args.quantize
+            )
+
+            if 'drums' in stem_arrays:
+                print("\n📊 Step 2: Separating drum stem into components...")
+                drum_files = separate_drums_array(
+                    stem_arrays['drums'],
+                    sample_rate,
+                    args.output_drums,
+                    stem_basename=f"{Path(args.input_file).stem}_drums"
+                )
+
+            # Surface any stem-write failure before the success banner —
+            # pool shutdown waits for the writes but does not re-raise
+            for future in write_futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ Error writing stem file: {e}")
+                    sys.exit(1)
+
+    elif args.mode == 'stems':
         print("\n📊 Step 1: Separating stereo mix into stems...")
         stem_files = separate_stems(
             args.input_file,
             args.output_stems,
-            args.model
+            args.model,
+            quantize=args.quantize
         )
 
-        if args.mode == 'both' and 'drums' in stem_files:
-            print("\n📊 Step 2: Separating drum stem into components...")
-            drum_files = separate_drums(
-                stem_files['drums'],
-                args.output_drums
-            )
-
     elif args.mode == 'drums':
         print("\n📊 Separating drum stem into components...")
         drum_files = separate_drums(
@@ -44,6 +44,25 @@ def test_filter_frequency_range_stereo():
     assert not np.array_equal(filtered, audio)
 
 
+def test_filter_frequency_range_matches_scipy():
+    """Test that the compiled (Numba) filter path matches scipy.signal.sosfilt"""
+    pytest.importorskip("numba")
+    from scipy import signal
+
+    from unmix.filters import _design_bandpass
+
+    sample_rate = 44100
+    audio = np.random.randn(2, sample_rate).astype(np.float32)
+
+    filtered = filter_frequency_range(audio, sample_rate, 100, 1000)
+    reference = signal.sosfilt(
+        _design_bandpass(sample_rate, 100, 1000), audio, axis=-1
+    )
+
+    # fastmath reorders the recurrence, so allow small float32 drift
+    assert np.allclose(filtered, reference, atol=1e-3)
+
+
 def test_filter_frequency_range_nyquist_limit():
     """Test that filter handles frequencies near Nyquist properly"""
     sample_rate = 44100